@@ -1,28 +1,57 @@
 from datetime import datetime
-from playsound import playsound
-from multiprocessing import Process
-from typing import Optional, Union, List, Tuple
-from stockscan import DummyScanner, StockMonitor, ScanResult, ALL_SCANNERS, Scanner
+from array import array
+from typing import Optional, Union, List, Tuple, Dict, Generator, NamedTuple, TYPE_CHECKING
+from stockscan import StockMonitor, ScanResult, ALL_SCANNERS, Scanner, Item
 from functools import partial
 
 import asyncio
 import time
 import curses
 import logging
-import json
-import dataclasses
-from pprint import PrettyPrinter
+import sys
 
-pp = PrettyPrinter(indent=2)
+if TYPE_CHECKING:
+    # audio is only needed by the GUI, imported when the GUI starts
+    import miniaudio
 
-# logging.basicConfig(filename='output.log', filemode='w', level=logging.WARNING)
-logging.basicConfig(level=logging.WARNING)
 logger = logging.getLogger(__name__)
 
 
-def loop_sound(file):
+def loop_sound(sound: 'miniaudio.DecodedSoundFile') -> Generator[array, int, None]:
+    """
+    Stream decoded audio samples over and over, to be played by a miniaudio.PlaybackDevice.
+    """
+    samples = sound.samples
+    position = 0
+    frames = yield b""
     while True:
-        playsound(file)
+        chunk = samples[position:position + frames * sound.nchannels]
+        position = (position + len(chunk)) % len(samples)
+        frames = yield chunk
+
+
+# color pairs used by the GUI
+RedPair, GreenPair, BluePair = 1, 2, 3
+_colors_initialized = False
+
+
+def init_colors():
+    """
+    Setup the GUI color pairs, once curses is initialized. Subsequent calls do nothing.
+    """
+    global _colors_initialized
+    if _colors_initialized:
+        return
+    _colors_initialized = True
+    if curses.has_colors():
+        curses.use_default_colors()
+        curses.init_pair(RedPair, curses.COLOR_RED, -1)
+        curses.init_pair(GreenPair, curses.COLOR_GREEN, -1)
+        curses.init_pair(BluePair, curses.COLOR_BLUE, -1)
+
+
+# characters ignored in scanner names given on the command line
+_SCANNER_NAME_IGNORED = str.maketrans('', '', '.-')
 
 
 class ExitException(Exception):
@@ -37,8 +66,20 @@ def plural_str(noun: str, count: int, plural_mark='s'):
     return f"{count} {noun}{plural_mark}"
 
 
+class Layout(NamedTuple):
+    padding: Tuple[int, int]
+    # (name, width) of each column, the last column taking the remaining width
+    columns: Tuple[Tuple[str, int], ...]
+    state_colors: Dict[str, int]
+    time_format: str
+
+
 class CursesGUI:
     MAX_FAIL = 5
+    # minimum delay (s) between two manual update requests, absorbs key repeats
+    UPDATE_REQUEST_DELAY = 0.5
+
+    Cell = Tuple[Optional[int], str, int]
 
     InStock = "In Stock"
     Unavailable = "Unavailable"
@@ -46,107 +87,201 @@ class CursesGUI:
 
     States = [InStock, Unavailable, Error]
 
+    Sounds = {InStock: "data/whohoo.mp3",
+              Error: "data/nooo.mp3"}
+
+    Padding = (3, 1)
+    TimeFormat = "%x-%X"
+    # color pair of each state
+    StateColorPairs = {InStock: GreenPair,
+                       Unavailable: 0,
+                       Error: RedPair}
+
+    # static texts
+    CheckText = "\tCheck "
+    HelpPrefix = "[ 'Q'uit | 'U'pdate now | "
+    HelpSeparator = " | "
+    HelpSuffix = " ]"
+    MuteText = "'M'ute"
+    UnmuteText = "Un'm'ute"
+    StartTestText = "Start 'T'est"
+    StopTestText = "Stop 'T'est"
+
     def __init__(self, monitor: StockMonitor, silent=False, silent_error=True, stdscr=None):
         self.monitor = monitor
         self.silent = silent
         self.silent_error = silent_error
 
         # notifications
-        self._notification_process: Optional[Process] = None
+        import miniaudio
+        self._notification_device: Optional[miniaudio.PlaybackDevice] = None
+        self._playing_state: Optional[str] = None
+        self._sounds: Dict[str, miniaudio.DecodedSoundFile] = {}
+        for state, file in CursesGUI.Sounds.items():
+            try:
+                sound = miniaudio.decode_file(file)
+            except miniaudio.MiniaudioError:
+                logger.exception("cannot load notification sound %s", file)
+            else:
+                if sound.samples:
+                    self._sounds[state] = sound
         self._notification_state: str = CursesGUI.Unavailable
 
         self._notification_forced_state: Optional[str] = None
 
         # init layout
-        curses.use_default_colors()
-        curses.init_pair(1, curses.COLOR_RED, -1)
-        curses.init_pair(2, curses.COLOR_GREEN, -1)
-        curses.init_pair(3, curses.COLOR_BLUE, -1)
-
-        time_format = "%x-%X"
-        self.layout = {
-            "padding": (3, 1),
-            "columns": (("Name", max(map(lambda s: len(s.name), self.monitor.scanners))),
-                        ("State", max(map(lambda s: len(s), CursesGUI.States))),
-                        ("Last Scan", max(len("Last Scan"), len("99s ago"))),
-                        ("Last Stock", len(datetime.now().strftime(time_format))),
-                        ("Details", -1)),
-            "state_colors": {
-                CursesGUI.InStock: curses.color_pair(2),
-                CursesGUI.Unavailable: 0,
-                CursesGUI.Error: curses.color_pair(1)
-            },
-            "time_format": time_format
+        init_colors()
+
+        # scanner names are built from their parameters, build them once
+        self._scanner_names = [scanner.name for scanner in self.monitor.scanners]
+
+        time_format = CursesGUI.TimeFormat
+        self.layout = Layout(
+            padding=CursesGUI.Padding,
+            columns=(("Name", max(map(len, self._scanner_names), default=len("Name"))),
+                     ("State", max(map(len, CursesGUI.States))),
+                     ("Last Scan", max(len("Last Scan"), len("99s ago"))),
+                     ("Last Stock", len(datetime.now().strftime(time_format))),
+                     ("Details", -1)),
+            state_colors={state: curses.color_pair(pair) for state, pair in CursesGUI.StateColorPairs.items()},
+            time_format=time_format)
+        padding = self.layout.padding
+        # x position of each column
+        self._col_x: List[int] = []
+        x = padding[0]
+        for _, column_width in self.layout.columns:
+            self._col_x.append(x)
+            x += column_width + padding[0]
+        # the pad is never narrower than the fixed columns, so that every column start can be written to
+        self._min_pad_width = self._col_x[-1] + 1
+        self._header_cells: List[CursesGUI.Cell] = [
+            (x, column_name, 0) for x, (column_name, _) in zip(self._col_x, self.layout.columns)]
+        # (color, state column attributes) of each state
+        self._state_render = {
+            state: (int(color), int(color) | (0 if state is CursesGUI.Unavailable else curses.A_STANDOUT))
+            for state, color in self.layout.state_colors.items()
         }
-        height = self.layout["padding"][1] + 1 + 2 * len(monitor.scanners) + 1
-        width = stdscr.getmaxyx()[1]
+        self._error_suffix = [f" #{count}" for count in range(10)] + [" #>9"]
+        self._url_attr = curses.color_pair(BluePair) | curses.A_UNDERLINE
+        self._standout = curses.A_STANDOUT
+
+        height = padding[1] + 1 + 2 * len(monitor.scanners) + 1
+        width = max(stdscr.getmaxyx()[1], self._min_pad_width)
         self.pad_size = (height, width)
         self.pad = curses.newpad(*self.pad_size)
         self.stdscr = stdscr
+        self._fit_to_screen()
+
+        # last drawn cells of each pad line
+        self._cell_cache: Dict[int, List[CursesGUI.Cell]] = {}
+        # redraw needed on next render, otherwise only redraw every second to update elapsed times
+        self._dirty = True
+        self._last_draw_time = 0.
+        self.monitor.register_to_scan(self._on_scan)
+        # wakes up the update loop, created by the update loop in its event loop
+        self._wake_event: Optional[asyncio.Event] = None
+        self._last_update_request = 0.
+        # formatted last stock time of each scanner
+        self._stock_time_text: Dict[int, Tuple[datetime, str]] = {}
+        # items details of each scanner, computed once per scan result
+        self._details_text: Dict[int, Tuple[List[Item], bool, str, Optional[str]]] = {}
+        # formatted elapsed seconds since last scan of each scanner
+        self._elapsed_text: Dict[int, Tuple[int, str]] = {}
+        curses.curs_set(False)
+        self.stdscr.nodelay(True)
+        # stdscr is never drawn upon, refresh it once so that polling it for inputs does not blank the screen
+        self.stdscr.refresh()
 
     def _grow_pad(self, sizeyx: Tuple[int, int]):
         self.pad_size = (self.pad_size[0] + sizeyx[0], self.pad_size[1] + sizeyx[1])
         self.pad = curses.newpad(*self.pad_size)
 
-    def _play_loop(self, file):
-        logger.debug("create notification process")
-        self._notification_process = Process(target=loop_sound,
-                                             args=(file,))
-        self._notification_process.daemon = True
-        self._notification_process.start()
+    def _play_loop(self, state: str):
+        sound = self._sounds.get(state)
+        if sound is None:
+            return
+        logger.debug("start notification sound")
+        import miniaudio
+        stream = loop_sound(sound)
+        next(stream)
+        try:
+            self._notification_device = miniaudio.PlaybackDevice(nchannels=sound.nchannels,
+                                                                 sample_rate=sound.sample_rate)
+        except miniaudio.MiniaudioError:
+            logger.exception("cannot open audio device")
+            return
+        self._notification_device.start(stream)
+        self._playing_state = state
 
     def _stop_sound(self):
-        if self._notification_process is not None:
-            logger.debug("killing notification process")
-            self._notification_process.terminate()
-            while self._notification_process.is_alive():
-                time.sleep(0.1)
-            self._notification_process.close()
-            self._notification_process = None
-            logger.debug("notification process killed")
+        if self._notification_device is not None:
+            logger.debug("stopping notification sound")
+            self._notification_device.close()
+            self._notification_device = None
+            logger.debug("notification sound stopped")
+        self._playing_state = None
+
+    def close(self):
+        """
+        Release the audio device, if a notification is playing.
+        """
+        self._stop_sound()
 
     @property
     def _is_playing_sound(self):
-        return self._notification_process is not None
+        return self._notification_device is not None
 
     def _play_sound_for_state(self):
-        if self._is_playing_sound:
-            self._stop_sound()
+        wanted_state = None
         if not self.silent:
             if self._notification_state == CursesGUI.InStock:
-                self._play_loop("data/whohoo.mp3")
+                wanted_state = CursesGUI.InStock
             elif not self.silent_error and self._notification_state == CursesGUI.Error:
-                self._play_loop("data/nooo.mp3")
+                wanted_state = CursesGUI.Error
+        if wanted_state is not None and wanted_state == self._playing_state:
+            return
+        if self._is_playing_sound:
+            self._stop_sound()
+        if wanted_state is not None:
+            self._play_loop(wanted_state)
 
     def _notify_state(self, state: str):
         if self._notification_state is state:
             return
         self._notification_state = state
-        logger.info(f"notification state going to: {state}")
+        logger.info("notification state going to: %s", state)
         self._play_sound_for_state()
 
     def _notifications(self):
         if self._notification_forced_state is not None:
             self._notify_state(self._notification_forced_state)
-        elif any(result[0].is_in_stock for result in self.monitor.last_results):
-            self._notify_state(CursesGUI.InStock)
-        elif any(result[2] >= CursesGUI.MAX_FAIL for result in self.monitor.last_results):
-            self._notify_state(CursesGUI.Error)
-        else:
-            self._notify_state(CursesGUI.Unavailable)
+            return
+        state = CursesGUI.Unavailable
+        for result, _, error_count in self.monitor.last_results:
+            if result.is_in_stock:
+                state = CursesGUI.InStock
+                break
+            if error_count >= CursesGUI.MAX_FAIL:
+                state = CursesGUI.Error
+        self._notify_state(state)
 
     def toggle_mute(self):
         self.silent = not self.silent
-        if self.silent and self._is_playing_sound:
-            self._stop_sound()
-        elif not self.silent:
-            self._play_sound_for_state()
+        self._dirty = True
+        self._play_sound_for_state()
+
+    def request_update(self):
+        now = time.monotonic()
+        if now - self._last_update_request > CursesGUI.UPDATE_REQUEST_DELAY:
+            self._last_update_request = now
+            self.monitor.update_now()
 
     def toggle_test_state(self):
         if self._notification_forced_state is None:
             self._notification_forced_state = self.InStock
         else:
             self._notification_forced_state = None
+        self._dirty = True
 
     @staticmethod
     def add_centered(stdscr, text, *args, **kwargs):
@@ -164,130 +299,225 @@ class CursesGUI:
         else:
             return CursesGUI.Unavailable
 
+    def _draw_cells(self, y: int, cells: List[Cell]):
+        """
+        Write the cells of line `y` that changed since the last frame.
+        Cells are rewritten from the first changed one to the end of line, a cell without x position
+        being written right after the previous one.
+        Adjacent cells sharing the same attributes are merged into a single write.
+        """
+        cached = self._cell_cache.get(y)
+        if cached == cells:
+            return
+        first = 0
+        if cached is not None:
+            while first < min(len(cells), len(cached)) and cells[first] == cached[first]:
+                first += 1
+            first = min(first, len(cells) - 1)
+        while cells[first][0] is None:
+            first -= 1
+
+        runs: List[list] = []
+        for x, text, attr in cells[first:]:
+            if runs and runs[-1][2] == attr and (x is None or runs[-1][0] is not None):
+                run = runs[-1]
+                if x is not None:
+                    width = x - run[0]
+                    run[1] = run[1][:width].ljust(width)
+                run[1] += text
+            else:
+                runs.append([x, text, attr])
+
+        pad = self.pad
+        max_x = self.pad_size[1] - 1
+        pad.move(y, cells[first][0])
+        pad.clrtoeol()
+        for x, text, attr in runs:
+            if x is not None:
+                pad.move(y, x)
+            room = max_x - pad.getyx()[1]
+            if room > 0:
+                pad.addnstr(text, room, attr)
+        self._cell_cache[y] = cells
+
+    def _fit_to_screen(self):
+        screen_height, screen_width = self.stdscr.getmaxyx()
+        pad_width = max(screen_width, self._min_pad_width)
+        if pad_width != self.pad_size[1]:
+            self.pad_size = (self.pad_size[0], pad_width)
+            self.pad.resize(*self.pad_size)
+        # pad area shown on screen, columns beyond the screen width are cut
+        self._pad_view = (0, 0, 0, 0, min(self.pad_size[0], screen_height) - 1, min(pad_width, screen_width) - 1)
+
+    def invalidate(self):
+        self._fit_to_screen()
+        self._cell_cache.clear()
+        self._dirty = True
+        self.pad.erase()
+
+    async def _on_scan(self, *args):
+        self._dirty = True
+        if self._wake_event is not None:
+            self._wake_event.set()
+
+    def render(self):
+        now = time.monotonic()
+        if self._dirty or now - self._last_draw_time >= 1.:
+            self._dirty = False
+            self._last_draw_time = now
+            self.draw()
+
     def draw(self):
         stdscr = self.pad
         self._notifications()
-        stdscr.clear()
-        curses.curs_set(False)
 
-        padding = self.layout["padding"]
-        x, y = padding
+        padding = self.layout.padding
+        y = padding[1]
 
-        columns = self.layout["columns"]
-        for column in columns:
-            stdscr.addstr(y, x, column[0])
-            x += column[1] + padding[0]
+        col_x = self._col_x
+        time_format = self.layout.time_format
+        now = time.monotonic()
+        self._draw_cells(y, self._header_cells)
 
         y += 1
-        for scanner, (result, last_stock_time, error_count) in zip(self.monitor.scanners, self.monitor.last_results):
-            if result.is_in_stock:
-                items_in_stock = [item for item in result.items if item.in_stock]
-                height = 1 + len(items_in_stock)
-            else:
-                items_in_stock = []
-                height = 2
-            # if y + height >= self.pad_size[0]:
-            #     self._grow_pad((height, 0))
-
-            x = padding[0]
+        for i, (scanner, name, (result, last_stock_time, error_count)) in enumerate(zip(self.monitor.scanners,
+                                                                                        self._scanner_names,
+                                                                                        self.monitor.last_results)):
+            cells = []
+            url = scanner.user_url
 
             state = CursesGUI.get_state(result)
-            color = int(self.layout["state_colors"][state])
-            stdscr.addstr(y, x, scanner.name, color)
-            x += columns[0][1] + padding[0]
+            color, state_attr = self._state_render[state]
+            cells.append((col_x[0], name, color))
 
             state_name = state
             if result.is_error:
-                state_name += f" #{'>' if error_count > 9 else ''}{min(9, error_count)}"
-            state_attr = 0 if state is CursesGUI.Unavailable else curses.A_STANDOUT
-            stdscr.addstr(y, x,
-                          state_name,
-                          color | state_attr)
-            x += columns[1][1] + padding[0]
-
-            elapsed = datetime.now() - result.timestamp
-            stdscr.addstr(y, x, f"{int(elapsed.total_seconds()):>2}s ago", color)
-            x += columns[2][1] + padding[0]
-
-            time_format = self.layout["time_format"]
+                state_name += self._error_suffix[min(10, error_count)]
+            cells.append((col_x[1], state_name, state_attr))
+
+            elapsed_secs = int(now - result.monotonic)
+            cached_secs, elapsed_text = self._elapsed_text.get(i, (None, None))
+            if cached_secs != elapsed_secs:
+                elapsed_text = "%2ds ago" % elapsed_secs
+                self._elapsed_text[i] = (elapsed_secs, elapsed_text)
+            cells.append((col_x[2], elapsed_text, color))
+
             if last_stock_time is not None:
-                stdscr.addstr(y, x, last_stock_time.strftime(time_format), color)
-            x += columns[3][1] + padding[0]
+                cached_time, stock_time_text = self._stock_time_text.get(i, (None, None))
+                if cached_time != last_stock_time:
+                    stock_time_text = last_stock_time.strftime(time_format)
+                    self._stock_time_text[i] = (last_stock_time, stock_time_text)
+                cells.append((col_x[3], stock_time_text, color))
+            else:
+                cells.append((col_x[3], "", color))
 
             if result.is_error:
-                stdscr.addstr(y, x, f"{type(result.error).__name__}: {result.error}", color)
+                cells.append((col_x[4], f"{type(result.error).__name__}: {result.error}", color))
             elif result.items is not None:
-                if result.is_in_stock:
-                    priced_items = items_in_stock
-                    text = "in stock"
-                else:
-                    priced_items = result.items
-                    text = "watched"
-
-                prices = sorted([item.price for item in priced_items])
-                stdscr.addstr(y, x, f"{plural_str('item', len(prices))} {text}")
-                if len(prices) > 0:
-                    if len(prices) > 1:
-                        price_text = f"[{prices[0]} ~ {prices[-1]}]"
-                    else:
-                        price_text = f"{prices[0]}"
-                    stdscr.addstr(f" @ {price_text}")
-            y += 1
-            if result.is_in_stock:
-                stdscr.addstr(y, padding[0], f"\tCheck ")
-                stdscr.addstr(items_in_stock[0].url, curses.color_pair(3) | curses.A_UNDERLINE)
-                y += 1
-                # for item in items_in_stock:
-                #     stdscr.addstr(y, padding[0], f"\tItem ")
-                #     stdscr.addstr(item.url, curses.color_pair(3) | curses.A_UNDERLINE)
-                #     y += 1
+                cached_items, cached, details, stock_url = self._details_text.get(i, (None, None, None, None))
+                if cached_items is not result.items or cached != result.cached:
+                    # only in stock items are counted if any
+                    in_stock = state is CursesGUI.InStock
+                    text = "in stock" if in_stock else "watched"
+
+                    count = 0
+                    min_price = max_price = stock_url = None
+                    for item in result.items:
+                        if in_stock:
+                            if not item.in_stock:
+                                continue
+                            if stock_url is None:
+                                stock_url = item.url
+                        price = item.price
+                        count += 1
+                        if min_price is None or price < min_price:
+                            min_price = price
+                        if max_price is None or price > max_price:
+                            max_price = price
+                    details = f"{plural_str('item', count)} {text}"
+                    if count > 0:
+                        if count > 1:
+                            price_text = f"[{min_price} ~ {max_price}]"
+                        else:
+                            price_text = f"{min_price}"
+                        details += f" @ {price_text}"
+                    if result.cached:
+                        details += " (not modified)"
+                    elif result.restored:
+                        details += " (restored)"
+                    self._details_text[i] = (result.items, result.cached, details, stock_url)
+                cells.append((col_x[4], details, 0))
+                if stock_url is not None:
+                    url = stock_url
             else:
-                stdscr.addstr(y, padding[0], f"\tCheck ")
-                stdscr.addstr(scanner.user_url, curses.color_pair(3) | curses.A_UNDERLINE)
-                y += 1
-
-        stdscr.addstr(y, padding[0], f"[ 'Q'uit | 'U'pdate now | ")
-
-        mute_cmd = "Un'm'ute" if self.silent else "'M'ute"
-        stdscr.addstr(mute_cmd, curses.A_STANDOUT if self.silent else 0)
+                cells.append((col_x[4], "", 0))
+            self._draw_cells(y, cells)
+            y += 1
 
-        stdscr.addstr(" | ")
-        test_cmd = "Start 'T'est" if self._notification_forced_state is None else "Stop 'T'est"
-        stdscr.addstr(test_cmd, curses.A_STANDOUT if self._notification_forced_state is not None else 0)
+            self._draw_cells(y, [(padding[0], CursesGUI.CheckText, 0),
+                                 (None, url, self._url_attr)])
+            y += 1
 
-        stdscr.addstr(" ]")
+        mute_cmd = CursesGUI.UnmuteText if self.silent else CursesGUI.MuteText
+        testing = self._notification_forced_state is not None
+        test_cmd = CursesGUI.StopTestText if testing else CursesGUI.StartTestText
+        self._draw_cells(y, [(padding[0], CursesGUI.HelpPrefix, 0),
+                             (None, mute_cmd, self._standout if self.silent else 0),
+                             (None, CursesGUI.HelpSeparator, 0),
+                             (None, test_cmd, self._standout if testing else 0),
+                             (None, CursesGUI.HelpSuffix, 0)])
 
-        pad_dims = stdscr.getmaxyx()
-        screen_dims = self.stdscr.getmaxyx()
-        stdscr.refresh(0, 0, 0, 0, min(pad_dims[0], screen_dims[0]) - 1, min(pad_dims[1], screen_dims[1]) - 1)
-        self.stdscr.refresh()
+        stdscr.noutrefresh(*self._pad_view)
+        curses.doupdate()
 
     def input_poll(self):
         # handle user inputs (quit)
-        self.stdscr.nodelay(True)
-        try:
-            key = self.stdscr.getkey()
-        except:
-            pass
-        else:
-            keyup = key.upper()
-            if keyup == 'Q':
-                raise ExitException
-            elif keyup == 'M':
-                self.toggle_mute()
-            elif keyup == 'U':
-                self.monitor.update_now()
-            elif keyup == 'T':
-                self.toggle_test_state()
+        while True:
+            key = self.stdscr.getch()
+            if key == -1:
+                break
+            if key == curses.KEY_RESIZE:
+                self.invalidate()
+            elif 0 <= key < 256:
+                keyup = chr(key).upper()
+                if keyup == 'Q':
+                    raise ExitException
+                elif keyup == 'M':
+                    self.toggle_mute()
+                elif keyup == 'U':
+                    self.request_update()
+                elif keyup == 'T':
+                    self.toggle_test_state()
+
+    def _on_input(self):
+        self._wake_event.set()
 
     async def update_loop(self):
+        self._wake_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        stdin = sys.stdin.fileno()
+        try:
+            # wake up on key presses, a timeout still catches up with elapsed times and terminal resizes
+            loop.add_reader(stdin, self._on_input)
+            timeout = 1.
+        except NotImplementedError:
+            # event loop without readers support (Windows), poll inputs
+            stdin = None
+            timeout = 0.1
         try:
             while True:
-                self.draw()
+                self.render()
                 self.input_poll()
-                await asyncio.sleep(0.1)
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake_event.clear()
         except ExitException:
             pass
+        finally:
+            if stdin is not None:
+                loop.remove_reader(stdin)
 
 
 class Main:
@@ -302,23 +532,17 @@ class Main:
     def _check_parameter(name_list: Union[None, str, List[str]]) -> List[str]:
         if name_list is None:
             return []
-        if isinstance(name_list, tuple):
-            name_list = list(name_list)
         if isinstance(name_list, str):
             name_list = name_list.split(",")
-        for i, name in enumerate(name_list):
-            name = name.replace('.', '').replace('-', '').lower().strip()
-            if not name.endswith("scanner"):
-                name += "scanner"
-            name_list[i] = name
-        return name_list
+        names = [name.translate(_SCANNER_NAME_IGNORED).lower().strip() for name in name_list]
+        return [name if name.endswith("scanner") else name + "scanner" for name in names]
 
     def _setup_scanners(self, pattern: str, only_scanners: List[str], except_scanners: List[str]) -> None:
-        all_scanner_name = ALL_SCANNERS.keys()
         if only_scanners:
-            scanner_names = [name for name in only_scanners if name in all_scanner_name]
+            scanner_names = [name for name in only_scanners if name in ALL_SCANNERS]
         else:
-            scanner_names = [name for name in all_scanner_name if name not in except_scanners]
+            except_scanners = frozenset(except_scanners)
+            scanner_names = [name for name in ALL_SCANNERS if name not in except_scanners]
 
         for name in scanner_names:
             self._scanners.append(ALL_SCANNERS[name](pattern))
@@ -329,9 +553,11 @@ class Main:
                   "user_url": scanner.user_url,
                   "result": result.to_dict()}
         if json_output:
+            import json
             print(json.dumps(output, indent=4, default=str))
         else:
-            pp.pprint(output)
+            from pprint import pprint
+            pprint(output, indent=2)
 
     def pattern(self, pattern: Union[str, List[str], Tuple[str]],
                 only_scanners: Union[str, List[str]] = None,
@@ -352,32 +578,36 @@ class Main:
                 self._setup_scanners(p, only_scanners, except_scanners)
         return self
 
-    def scan(self, json=False):
+    def scan(self, json=False, disk_cache_ttl=0):
         """
         Perform a single scan on all vendors.
+
+        Args:
+            disk_cache_ttl (float): Reuse the results saved by previous runs when younger than this (seconds).
         """
         try:
-            monitor = StockMonitor(self._scanners)
+            monitor = StockMonitor(self._scanners, disk_cache_ttl=disk_cache_ttl)
             monitor.register_to_scan(partial(Main._print_scan_result, json))
-            asyncio.get_event_loop().run_until_complete(monitor.single_update())
+            asyncio.run(monitor.single_update())
         except KeyboardInterrupt:
             logger.debug("interrupted")
 
-    def loop(self, json=False, update_freq=30):
+    def loop(self, json=False, update_freq=30, disk_cache_ttl=0):
         """
         Loop scan on all vendors at fixed interval.
 
         Args:
             update_freq (float): The interval at which scans are performed.
+            disk_cache_ttl (float): Reuse the results saved by previous runs when younger than this (seconds).
         """
         try:
-            monitor = StockMonitor(self._scanners, update_freq=update_freq)
+            monitor = StockMonitor(self._scanners, update_freq=update_freq, disk_cache_ttl=disk_cache_ttl)
             monitor.register_to_scan(partial(Main._print_scan_result, json))
-            asyncio.get_event_loop().run_until_complete(monitor.update_loop())
+            asyncio.run(monitor.update_loop())
         except KeyboardInterrupt:
             logger.debug("interrupted")
 
-    def gui(self, update_freq=30, silent=False, silent_error=True):
+    def gui(self, update_freq=30, silent=False, silent_error=True, disk_cache_ttl=0):
         """
         Loop scan on all vendors at fixed interval and display results in a curses GUI.
 
@@ -385,8 +615,9 @@ class Main:
             update_freq (float): The interval at which scans are performed.
             silent (bool): play sound when stock state changes
             silent_error (bool): play sound when scan results in an error
+            disk_cache_ttl (float): Reuse the results saved by previous runs when younger than this (seconds).
         """
-        curses.wrapper(partial(self._gui_loop, update_freq, silent, silent_error))
+        curses.wrapper(partial(self._gui_loop, update_freq, silent, silent_error, disk_cache_ttl))
 
     def list(self):
         """
@@ -394,16 +625,27 @@ class Main:
         """
         return [name.replace('scanner', '') for name in ALL_SCANNERS.keys()]
 
-    def _gui_loop(self, update_freq, silent, silent_error, stdscr):
-        monitor = StockMonitor(self._scanners, update_freq=update_freq)
+    def _gui_loop(self, update_freq, silent, silent_error, disk_cache_ttl, stdscr):
+        monitor = StockMonitor(self._scanners, update_freq=update_freq, disk_cache_ttl=disk_cache_ttl)
         app = CursesGUI(monitor, silent=silent, silent_error=silent_error, stdscr=stdscr)
 
         async def main_loop():
-            await asyncio.wait(map(asyncio.create_task, [app.update_loop(), monitor.update_loop()]),
-                               return_when=asyncio.FIRST_COMPLETED)
-        asyncio.get_event_loop().run_until_complete(main_loop())
+            _, pending = await asyncio.wait([asyncio.create_task(app.update_loop()),
+                                             asyncio.create_task(monitor.update_loop())],
+                                            return_when=asyncio.FIRST_COMPLETED)
+            # stop scanning as soon as the GUI exits
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        try:
+            asyncio.run(main_loop())
+        finally:
+            app.close()
 
 
 if __name__ == '__main__':
     import fire
+
+    # logging.basicConfig(filename='output.log', filemode='w', level=logging.WARNING)
+    logging.basicConfig(level=logging.WARNING)
     fire.Fire(Main)
@@ -1,5 +1,7 @@
 from typing import List
 from .scanner import Scanner, Item
+from aiohttp import ClientSession
+from itertools import accumulate
 import random
 import asyncio
 
@@ -13,19 +15,23 @@ class DummyScanner(Scanner, is_concrete_scanner=False):
     def __init__(self, stocks=1, unavailable=1, error=1, delay=1):
         super().__init__("Dummy")
         self._weights = [stocks, unavailable, error]
+        # in stock, unavailable or error (a fresh exception is raised on each error outcome)
+        self._population = [True, False, None]
+        # constant weights, accumulated once instead of on every draw
+        self._cum_weights = list(accumulate(self._weights))
         self._delay = delay
 
     @property
     def user_url(self) -> str:
         return "http://www.dummy.com/"
 
-    async def _scan(self) -> List[Item]:
+    async def _scan(self, session: ClientSession) -> List[Item]:
         if self._delay > 0:
             await asyncio.sleep(self._delay)
-        outcome = random.choices([True, False, DummyException()], self._weights)[0]
-        if isinstance(outcome, DummyException):
-            raise outcome
-        return [Item(title="Dummy item", price=99.99, in_stock=outcome)]
+        outcome = random.choices(self._population, cum_weights=self._cum_weights)[0]
+        if outcome is None:
+            raise DummyException()
+        return [Item(title="Dummy item", price=99.99, in_stock=outcome, url=self.user_url)]
 
     @property
     def name(self) -> str:
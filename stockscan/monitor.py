@@ -1,17 +1,29 @@
 import asyncio
+import hashlib
+import json
 import logging
+import os
+import re
+import time
 
-from typing import Optional, List, Tuple, Iterable
-from stockscan.scanner import Scanner, ScanResult
+from typing import Optional, List, Tuple, Iterable, Dict
+from stockscan.scanner import Scanner, ScanResult, Item, make_session
+from aiohttp import ClientSession
+from dataclasses import asdict
 from datetime import datetime
 from threading import Thread
 from contextlib import contextmanager
+from urllib.parse import urlparse
 
 logger = logging.getLogger(__name__)
 
+# last scan results kept across runs, one file per scanner
+DISK_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "nvidiawatch")
+_DISK_CACHE_NAME_IGNORED = re.compile(r"[^\w.-]+")
 
-async def update_scanner(scanner):
-    return await scanner.scan()
+
+async def update_scanner(scanner, session):
+    return await scanner.scan(session)
 
 
 class InterruptEvent(Exception):
@@ -20,9 +32,27 @@ class InterruptEvent(Exception):
 
 
 class StockMonitor:
-    def __init__(self, scanners: List[Scanner], update_freq=30):
+    # delay (s) between the scan starts of two different vendor hosts
+    HOST_STAGGER = 0.05
+
+    def __init__(self, scanners: List[Scanner], update_freq=30, concurrency=32, per_host_concurrency=1,
+                 disk_cache_ttl=0):
         self._update_freq = update_freq
+        self._concurrency = concurrency
+        # simultaneous scans of a single vendor host, the others wait for their turn before starting their requests
+        self._per_host_concurrency = per_host_concurrency
         self._scanners = scanners
+        # successful results younger than disk_cache_ttl (s) are read back from disk instead of scanning (0 disables)
+        self._disk_cache_ttl = disk_cache_ttl
+
+        # scans of each vendor host start together (the host semaphores serialize them), hosts start one after another
+        self._scanner_hosts = [urlparse(getattr(scanner, "target_url", scanner.user_url)).netloc
+                               for scanner in scanners]
+        host_indices = {}
+        for host in self._scanner_hosts:
+            host_indices.setdefault(host, len(host_indices))
+        self._scan_delays: List[float] = [host_indices[host] * StockMonitor.HOST_STAGGER
+                                          for host in self._scanner_hosts]
         self._last_update_time = None
 
         # scan results
@@ -30,6 +60,10 @@ class StockMonitor:
         self._last_results: List[ScanResult] = [ScanResult(now)] * len(scanners)
         self._last_stock_time: List[Optional[datetime]] = [None] * len(scanners)
         self._consecutive_errors: List[int] = [0] * len(scanners)
+        # time.monotonic() until which the result loaded from the disk cache is used instead of scanning
+        self._restored_until: List[float] = [0.] * len(scanners)
+        if self._disk_cache_ttl > 0:
+            self._load_disk_cache()
 
         # scan events
         self._scan_event_callbacks = set()
@@ -42,9 +76,79 @@ class StockMonitor:
         # cancel events
         self._cancel_event = None
 
+        # http session shared by all scanners
+        self._session: Optional[ClientSession] = None
+        # bounds the number of simultaneous scans, overall and per vendor host
+        self._scan_semaphore: Optional[asyncio.Semaphore] = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @staticmethod
+    def _disk_cache_path(scanner: Scanner) -> str:
+        # readable name, made unique by the digest of everything the scanner searches with
+        key_digest = hashlib.sha1(scanner.cache_key.encode()).hexdigest()[:12]
+        file_name = f"{_DISK_CACHE_NAME_IGNORED.sub('_', scanner.name)}_{key_digest}.json"
+        return os.path.join(DISK_CACHE_DIR, file_name)
+
+    def _load_disk_cache(self) -> None:
+        now = datetime.now()
+        for i, scanner in enumerate(self._scanners):
+            try:
+                with open(self._disk_cache_path(scanner), encoding="utf-8") as f:
+                    entry = json.load(f)
+                timestamp = datetime.fromisoformat(entry["timestamp"])
+                age = (now - timestamp).total_seconds()
+                if not 0 <= age < self._disk_cache_ttl:
+                    continue
+                items = [Item(**item) for item in entry["items"]]
+                last_stock_time = entry["last_stock_time"]
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError, KeyError, TypeError):
+                logger.warning("Ignoring invalid cache file of %s", scanner.name)
+                continue
+            self._last_results[i] = ScanResult(timestamp=timestamp, items=items, restored=True,
+                                               monotonic=time.monotonic() - age)
+            if last_stock_time is not None:
+                self._last_stock_time[i] = datetime.fromisoformat(last_stock_time)
+            self._restored_until[i] = time.monotonic() + self._disk_cache_ttl - age
+
+    async def _save_disk_cache(self, i: int) -> None:
+        result = self._last_results[i]
+        last_stock_time = self._last_stock_time[i]
+        entry = {"timestamp": result.timestamp.isoformat(),
+                 "items": [asdict(item) for item in result.items],
+                 "last_stock_time": last_stock_time.isoformat() if last_stock_time is not None else None}
+        scanner = self._scanners[i]
+        # file writes would block the event loop
+        await asyncio.to_thread(StockMonitor._write_disk_cache_file, self._disk_cache_path(scanner), entry,
+                                scanner.name)
+
+    @staticmethod
+    def _write_disk_cache_file(path: str, entry: dict, scanner_name: str) -> None:
+        try:
+            os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+            # write then rename so that a concurrent reader never sees a partial file
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(path + ".tmp", path)
+        except OSError:
+            logger.warning("Could not write cache file of %s", scanner_name)
+
+    def _create_semaphores(self) -> None:
+        # bound to the running loop
+        self._scan_semaphore = asyncio.Semaphore(self._concurrency)
+        self._host_semaphores = {host: asyncio.Semaphore(self._per_host_concurrency)
+                                 for host in set(self._scanner_hosts)}
+
     async def _update_scanners(self):
         async def result_with_index(i):
-            res = await self._scanners[i].scan()
+            if time.monotonic() < self._restored_until[i]:
+                return i, self._last_results[i]
+            if self._scan_delays[i]:
+                await asyncio.sleep(self._scan_delays[i])
+            # waiting for its turn is not counted in the request timeouts of the scan
+            async with self._host_semaphores[self._scanner_hosts[i]], self._scan_semaphore:
+                res = await self._scanners[i].scan(self._session)
             return i, res
 
         for task in asyncio.as_completed([result_with_index(i) for i in range(len(self._scanners))]):
@@ -58,9 +162,12 @@ class StockMonitor:
             self._last_results[i] = result
             await self.dispatch_scan_event(self._scanners[i], result,
                                            self._last_stock_time[i], self._consecutive_errors[i])
+            if self._disk_cache_ttl > 0 and not result.is_error and not result.restored:
+                await self._save_disk_cache(i)
 
     async def interruptible(self, coro):
-        done, pending = await asyncio.wait([coro, self._cancel_event.wait()], return_when=asyncio.FIRST_COMPLETED)
+        done, pending = await asyncio.wait([asyncio.create_task(coro), asyncio.create_task(self._cancel_event.wait())],
+                                           return_when=asyncio.FIRST_COMPLETED)
         try:
             if self._cancel_event.is_set():
                 raise InterruptEvent()
@@ -87,8 +194,8 @@ class StockMonitor:
         for fun in self._scan_event_callbacks:
             try:
                 await fun(scanner, result, last_stock_time, consecutive_errors)
-            except Exception as err:
-                logger.exception("Exception during scan event dispatch", err)
+            except Exception:
+                logger.exception("Exception during scan event dispatch")
 
     def register_to_scan(self, callback):
         self._scan_event_callbacks.add(callback)
@@ -99,19 +206,23 @@ class StockMonitor:
     async def single_update(self):
         self._loop = asyncio.get_running_loop()
         self._cancel_event = asyncio.Event()
-        try:
-            await self.interruptible(self.update_round(sleep=False))
-        except InterruptEvent:
-            self._cancel_event.clear()
+        self._create_semaphores()
+        async with make_session(keepalive_timeout=2 * self._update_freq) as self._session:
+            try:
+                await self.interruptible(self.update_round(sleep=False))
+            except InterruptEvent:
+                self._cancel_event.clear()
 
     async def update_loop(self):
         self._loop = asyncio.get_running_loop()
         self._cancel_event = asyncio.Event()
-        while not self.stop_update:
-            try:
-                await self.interruptible(self.update_round())
-            except InterruptEvent:
-                self._cancel_event.clear()
+        self._create_semaphores()
+        async with make_session(keepalive_timeout=2 * self._update_freq) as self._session:
+            while not self.stop_update:
+                try:
+                    await self.interruptible(self.update_round())
+                except InterruptEvent:
+                    self._cancel_event.clear()
 
     def interrupt(self) -> None:
         def cancel():
@@ -120,6 +231,8 @@ class StockMonitor:
         self._loop.call_soon_threadsafe(cancel)
 
     def update_now(self) -> None:
+        # an explicit update scans again the scanners whose results were restored from disk
+        self._restored_until = [0.] * len(self._scanners)
         self.interrupt()
 
     def start_in_thread(self) -> None:
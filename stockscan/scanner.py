@@ -1,12 +1,31 @@
-from typing import Optional, Union, List, Tuple, Dict
+from typing import Optional, Union, List, Tuple, Dict, Pattern
 from datetime import datetime
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from bs4.element import Tag
 from json.decoder import JSONDecodeError
-from dataclasses import dataclass
-from aiohttp import ClientTimeout, ContentTypeError
+from functools import lru_cache
+from dataclasses import dataclass, field
+from aiohttp import ClientTimeout, ClientSession, TCPConnector
+from urllib.parse import quote
 
 import aiohttp
+import hashlib
+import json
+import re
+import time
+
+try:
+    # faster json parsing if available
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    # aiohttp only decodes brotli bodies when the brotli package is installed (aiohttp[speedups])
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
 
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/105.0.0.0 " \
              "Safari/537.36 "
@@ -14,20 +33,44 @@ USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTM
 ALL_SCANNERS = {}
 
 
-def make_soup(content):
-    return BeautifulSoup(content, 'html.parser')
+def make_session(keepalive_timeout: float = 60, limit_per_host: int = 0, ttl_dns_cache: float = 300) -> ClientSession:
+    # keep idle connections open across scan rounds (aiohttp closes them after 15s by default)
+    # no connection limit by default: time spent waiting for a pooled connection counts in the total timeout of
+    # a request, scans queued behind a busy connection would time out, callers bound their concurrent scans instead
+    # vendor hosts are resolved again every few minutes only (aiohttp forgets them after 10s by default)
+    return ClientSession(connector=TCPConnector(limit=0, limit_per_host=limit_per_host,
+                                                keepalive_timeout=keepalive_timeout,
+                                                ttl_dns_cache=ttl_dns_cache))
 
 
-def parse_search_terms(search_terms: str) -> Tuple[List[str], List[str]]:
-    terms = list(filter(None, search_terms.lower().split(" ")))
+def make_soup(content, encoding: Optional[str] = None, parse_only: Optional[SoupStrainer] = None):
+    # raw bytes are decoded by lxml itself, `encoding` being the charset announced by the server if any
+    return BeautifulSoup(content, 'lxml', from_encoding=encoding, parse_only=parse_only)
+
+
+def class_strainer(class_name: str) -> SoupStrainer:
+    # at parse time bs4 matches class_ against the whole class attribute, "a b" would not match "a"
+    return SoupStrainer(class_=re.compile(r"(^|\s){}(\s|$)".format(re.escape(class_name))))
+
+
+@lru_cache(maxsize=128)
+def parse_search_terms(search_terms: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
     keywords: List[str] = []
     blacklist: List[str] = []
-    for term in terms:
+    # split() without separator already drops the empty strings of repeated spaces
+    for term in search_terms.lower().split():
         if term.startswith("-"):
             blacklist.append(term[1:])
         else:
             keywords.append(term)
-    return keywords, blacklist
+    # results are shared by the cache, make them immutable
+    return tuple(keywords), tuple(blacklist)
+
+
+@lru_cache(maxsize=128)
+def compile_blacklist(blacklist: Tuple[str, ...]) -> Optional[Pattern]:
+    # any blacklisted keyword found in a single pass over the title
+    return re.compile('|'.join(map(re.escape, blacklist))) if blacklist else None
 
 
 @dataclass
@@ -43,6 +86,12 @@ class ScanResult:
     timestamp: datetime = None
     error: Optional[Exception] = None
     items: Optional[List[Item]] = None
+    # items are the ones of the previous scan, the vendor page did not change
+    cached: bool = False
+    # items were saved to disk by a previous run and read back instead of scanning
+    restored: bool = False
+    # time.monotonic() at result creation, to measure elapsed time cheaply
+    monotonic: float = field(default_factory=time.monotonic)
 
     @property
     def is_error(self) -> bool:
@@ -56,7 +105,9 @@ class ScanResult:
         return {
             "timestamp": self.timestamp,
             "error": self.error,
-            "items": self.items
+            "items": self.items,
+            "cached": self.cached,
+            "restored": self.restored
         }
 
 
@@ -73,13 +124,16 @@ class MetaScanner(type):
 class Scanner(metaclass=MetaScanner, is_concrete_scanner=False):
     def __init__(self, name: str):
         self._name = name
+        # set by _scan when it reuses the items of the previous scan
+        self._scan_cached = False
 
-    async def _scan(self) -> List[Item]:
+    async def _scan(self, session: ClientSession) -> List[Item]:
         raise Exception("Not Implemented")
 
-    async def scan(self) -> ScanResult:
+    async def scan(self, session: ClientSession) -> ScanResult:
+        self._scan_cached = False
         try:
-            items = await self._scan()
+            items = await self._scan(session)
         except Exception as err:
             items = None
             error = err
@@ -88,7 +142,8 @@ class Scanner(metaclass=MetaScanner, is_concrete_scanner=False):
         timestamp = datetime.now()
         return ScanResult(timestamp=timestamp,
                           items=items,
-                          error=error)
+                          error=error,
+                          cached=self._scan_cached)
 
     @property
     def user_url(self) -> str:
@@ -98,15 +153,34 @@ class Scanner(metaclass=MetaScanner, is_concrete_scanner=False):
     def name(self) -> str:
         return self._name
 
+    @property
+    def cache_key(self) -> str:
+        # identifies the scanner and everything it searches with, across runs
+        return self.name
+
 
 class HttpScanner(Scanner, is_concrete_scanner=False):
     PageEntry = Union[dict, Tag]
     Page = Union[dict, BeautifulSoup]
 
+    # reuse the previous items when the page is not modified: answered 304 to a conditional GET request or
+    # identical to the previous one, in the later case items are parsed again once they are older than cache_ttl
+    reuse_unmodified = True
+    cache_ttl = 300.
+    # only build the tree of matching html elements, when everything scanned is found in them
+    parse_only: Optional[SoupStrainer] = None
+    # set to True by vendors only answering with json, whose body is then decoded without trying html
+    json_only = False
+
     def __init__(self, name: str, method='GET', time_out=5):
         super().__init__(name)
         self.method = method
         self.time_out = time_out
+        # validators of the last response (If-None-Match / If-Modified-Since headers) and its items
+        self._cache_validators: Dict[str, str] = {}
+        self._cached_items: Optional[List[Item]] = None
+        self._cached_body_digest: Optional[bytes] = None
+        self._cached_time = 0.
 
     @property
     def target_url(self) -> str:
@@ -127,72 +201,141 @@ class HttpScanner(Scanner, is_concrete_scanner=False):
     def _get_item_url(self, item: PageEntry, content: Page) -> str:
         return self.user_url
 
-    def filter_item(self, item: Item) -> bool:
+    def filter_title(self, title: str) -> bool:
         return True
 
     @property
     def payload(self) -> Union[str, dict]:
         return ''
 
-    def _get_item(self, entry: PageEntry, page: Page) -> Item:
-        item = Item(title=self._get_item_title(entry, page),
+    def _get_item(self, entry: PageEntry, page: Page, title: str) -> Item:
+        item = Item(title=title,
                     price=self._get_item_price(entry, page),
                     in_stock=self._is_item_in_stock(entry, page),
                     url=self._get_item_url(entry, page))
         return item
 
-    async def _scan_response(self, content: Page) -> List[Item]:
-        entries = self._get_all_items_in_page(content)
-        return [item for item in (self._get_item(entry, content) for entry in entries) if self.filter_item(item)]
+    async def _scan_response(self, content: Page, session: ClientSession) -> List[Item]:
+        items = []
+        for entry in self._get_all_items_in_page(content):
+            # price, stock and url are only parsed for wanted items
+            title = self._get_item_title(entry, content)
+            if self.filter_title(title):
+                items.append(self._get_item(entry, content, title))
+        return items
 
     @property
     def request_headers(self) -> dict:
-        return {'user-agent': USER_AGENT}
+        return {'user-agent': USER_AGENT,
+                'accept': 'text/html,application/json;q=0.9,*/*;q=0.8',
+                'accept-encoding': ACCEPT_ENCODING}
 
     @property
     def cookies(self) -> dict:
         return {}
 
-    async def _scan(self):
+    async def _scan(self, session: ClientSession):
         if self.method not in ['GET', 'POST']:
             raise ValueError(f"Unsupported method: {self.method}")
 
-        async with aiohttp.ClientSession(headers=self.request_headers,
-                                         cookies=self.cookies,
-                                         raise_for_status=True,
-                                         timeout=ClientTimeout(total=self.time_out)) as session:
-            if self.method == 'GET':
-                request_method = session.get
-            elif self.method == 'POST':
-                request_method = session.post
-            async with request_method(self.target_url, data=self.payload) as resp:
+        reuse = self.reuse_unmodified and self.method == 'GET'
+        headers = self.request_headers
+        if reuse and self._cache_validators and self._cached_items is not None:
+            headers = dict(headers, **self._cache_validators)
+
+        async with session.request(self.method, self.target_url,
+                                   data=self.payload,
+                                   headers=headers,
+                                   cookies=self.cookies,
+                                   raise_for_status=True,
+                                   timeout=ClientTimeout(total=self.time_out)) as resp:
+            self.request_url = resp.url
+            if resp.status == 304 and self._cached_items is not None:
+                self._scan_cached = True
+                return self._cached_items
+            body = await resp.read()
+            if reuse:
+                body_digest = hashlib.sha1(body).digest()
+                if body_digest == self._cached_body_digest and self._cached_items is not None \
+                        and time.monotonic() - self._cached_time < self.cache_ttl:
+                    self._scan_cached = True
+                    return self._cached_items
+            if self.json_only:
+                content = json_loads(body)
+            elif 'json' in resp.content_type:
                 try:
-                    content = await resp.json()
-                except (JSONDecodeError, ContentTypeError):
-                    text = await resp.text()
-                    content = make_soup(text)
-                self.request_url = resp.url
-                return await self._scan_response(content)
+                    content = json_loads(body)
+                except JSONDecodeError:
+                    content = make_soup(body, resp.charset, self.parse_only)
+            else:
+                content = make_soup(body, resp.charset, self.parse_only)
+            items = await self._scan_response(content, session)
+            if reuse:
+                self._cache_validators = {}
+                if 'ETag' in resp.headers:
+                    self._cache_validators['If-None-Match'] = resp.headers['ETag']
+                if 'Last-Modified' in resp.headers:
+                    self._cache_validators['If-Modified-Since'] = resp.headers['Last-Modified']
+                self._cached_items = items
+                self._cached_body_digest = body_digest
+                self._cached_time = time.monotonic()
+            return items
 
     @property
     def user_url(self) -> str:
         return self.target_url
 
+    @property
+    def cache_key(self) -> str:
+        return f"{super().cache_key} {self.target_url}"
+
 
 class SearchBasedHttpScanner(HttpScanner, is_concrete_scanner=False):
+    # search url, '{query}' being replaced with the quoted keywords joined by query_separator
+    target_url_template: Optional[str] = None
+    # page shown to the user when it differs from the scanned one, formatted the same way
+    user_url_template: Optional[str] = None
+    query_separator = ' '
+
     def __init__(self, name: str, search_terms: str, **kwargs):
         self._keywords, self._blacklist = parse_search_terms(search_terms)
+        query = quote(self.query_separator.join(self._keywords))
+        self._target_url: Optional[str] = None
+        if self.target_url_template is not None:
+            self._target_url = self.target_url_template.format(query=query)
+        self._user_url: Optional[str] = None
+        if self.user_url_template is not None:
+            self._user_url = self.user_url_template.format(query=query)
+        self._blacklist_regex = compile_blacklist(self._blacklist)
         super().__init__(name, **kwargs)
 
-    def filter_item(self, item: Item) -> bool:
-        return self.is_title_valid(item.title)
+    @property
+    def target_url(self) -> str:
+        if self._target_url is None:
+            raise Exception("Not Implemented")
+        return self._target_url
+
+    @property
+    def user_url(self) -> str:
+        if self._user_url is None:
+            return self.target_url
+        return self._user_url
+
+    def filter_title(self, title: str) -> bool:
+        return self.is_title_valid(title)
 
     def is_title_valid(self, item_title: str) -> bool:
-        keywords = self._keywords
-        blacklist = self._blacklist
         text = item_title.lower()
-        return all(k in text for k in keywords) and not any(k in text for k in blacklist)
+        for keyword in self._keywords:
+            if keyword not in text:
+                return False
+        return self._blacklist_regex is None or self._blacklist_regex.search(text) is None
 
     @property
     def name(self) -> str:
         return f"{super().name}[{'+'.join(self._keywords)}]"
+
+    @property
+    def cache_key(self) -> str:
+        # the name only holds the keywords
+        return f"{super().cache_key} {' '.join('-' + term for term in self._blacklist)}"
@@ -3,9 +3,15 @@ from typing import List
 from urllib.parse import quote
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+import soupsieve
 
-from aiohttp import ClientTimeout
-import aiohttp
+from aiohttp import ClientTimeout, ClientSession
+
+# compiled css selectors
+ITEMS_SELECTOR = soupsieve.compile(".listing a.productBox")
+TITLE_SELECTOR = soupsieve.compile("div.product-name")
+PRICE_SELECTOR = soupsieve.compile(".price")
+STOCK_SELECTOR = soupsieve.compile(".delivery-info")
 
 
 class AlternateScanner(SearchBasedHttpScanner, is_concrete_scanner=False):
@@ -13,10 +19,8 @@ class AlternateScanner(SearchBasedHttpScanner, is_concrete_scanner=False):
         name = "Alternate" + locale.upper()
         self._locale = locale.lower()
         super().__init__(name, search_terms, method="POST", **kwargs)
-
-    @property
-    def target_url(self) -> str:
-        return f"https://www.alternate.{self._locale}/listing.xhtml"
+        self._target_url = f"https://www.alternate.{self._locale}/listing.xhtml"
+        self._user_url = f'{self._target_url}?q={quote(" ".join(self._keywords))}'
 
     @property
     def payload(self) -> dict:
@@ -30,48 +34,41 @@ class AlternateScanner(SearchBasedHttpScanner, is_concrete_scanner=False):
                 'javax.faces.behavior.event': 'action',
                 'javax.faces.partial.ajax': 'true'}
 
-    async def _scan(self):
-        async with aiohttp.ClientSession(headers=self.request_headers,
-                                         raise_for_status=True,
-                                         timeout=ClientTimeout(total=self.time_out)) as session:
-
-            query_url = f'{self.target_url}?q={quote(" ".join(self._keywords))}'
-            async with session.get(query_url):
-                # get session cookies
-                pass
-
-            headers = {
-                'Origin': f'https://www.alternate.{self._locale}',
-                'Referer': query_url
-            }
-            async with session.post(self.target_url, data=self.payload, headers=headers) as resp:
-                text = await resp.text()
-                content = make_soup(text)
-                self.request_url = resp.url
-                return await self._scan_response(content)
+    async def _scan(self, session: ClientSession):
+        timeout = ClientTimeout(total=self.time_out)
+        async with session.get(self.user_url, headers=self.request_headers, raise_for_status=True, timeout=timeout):
+            # get session cookies
+            pass
+
+        headers = dict(self.request_headers)
+        headers.update({
+            'Origin': f'https://www.alternate.{self._locale}',
+            'Referer': self.user_url
+        })
+        async with session.post(self.target_url, data=self.payload, headers=headers,
+                                raise_for_status=True, timeout=timeout) as resp:
+            content = make_soup(await resp.read(), resp.charset)
+            self.request_url = resp.url
+            return await self._scan_response(content, session)
 
     def _get_all_items_in_page(self, bs: BeautifulSoup) -> List[Tag]:
-        return bs.select(".listing a.productBox")
+        return ITEMS_SELECTOR.select(bs)
 
     def _get_item_title(self, item: Tag, bs: BeautifulSoup) -> str:
-        return item.select_one("div.product-name").get_text().strip()
+        return TITLE_SELECTOR.select_one(item).get_text().strip()
 
     def _get_item_price(self, item: Tag, content: BeautifulSoup) -> float:
         def parse_price(text: str) -> float:
             return float(text.replace('€', '').replace('.', '').replace(',', '.').strip())
 
-        return parse_price(item.select_one(".price").get_text())
+        return parse_price(PRICE_SELECTOR.select_one(item).get_text())
 
     def _is_item_in_stock(self, item: Tag, bs: BeautifulSoup) -> bool:
-        return item.select_one(".delivery-info").get_text().strip().lower() == "en stock"
+        return STOCK_SELECTOR.select_one(item).get_text().strip().lower() == "en stock"
 
     def _get_item_url(self, item: Tag, content: BeautifulSoup) -> str:
         return item.attrs["href"]
 
-    @property
-    def user_url(self) -> str:
-        return f'https://www.alternate.{self._locale}/listing.xhtml?q={quote(" ".join(self._keywords))}'
-
 
 class AlternateDEScanner(AlternateScanner):
     def __init__(self, search_terms: str, **kwargs):
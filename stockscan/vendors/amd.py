@@ -1,19 +1,27 @@
-from stockscan.scanner import SearchBasedHttpScanner
+from stockscan.scanner import SearchBasedHttpScanner, class_strainer
 from typing import List
 from yarl import URL
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+import soupsieve
+
+# compiled css selectors
+ITEMS_SELECTOR = soupsieve.compile(".view-shop-product-search .shop-content")
+TITLE_SELECTOR = soupsieve.compile(".shop-title")
+PRICE_SELECTOR = soupsieve.compile(".shop-price")
+STOCK_SELECTOR = soupsieve.compile(".shop-links button")
+LINK_SELECTOR = soupsieve.compile(".shop-details a")
 
 
 class AMDScanner(SearchBasedHttpScanner):
+    # the search is done on the page itself, the url has no query
+    target_url_template = "https://www.amd.com/fr/direct-buy/fr"
+    parse_only = class_strainer("view-shop-product-search")
+
     def __init__(self, search_terms: str, **kwargs):
         name = "AMD"
         super().__init__(name, search_terms, **kwargs)
 
-    @property
-    def target_url(self) -> str:
-        return "https://www.amd.com/fr/direct-buy/fr"
-
     @property
     def cookies(self) -> dict:
         return {"pmuser_country": "fr"}
@@ -25,17 +33,17 @@ class AMDScanner(SearchBasedHttpScanner):
         return headers
 
     def _get_all_items_in_page(self, bs: BeautifulSoup) -> List[Tag]:
-        return bs.select(".view-shop-product-search .shop-content")
+        return ITEMS_SELECTOR.select(bs)
 
     def _get_item_title(self, item: Tag, bs: BeautifulSoup) -> str:
-        return item.select_one(".shop-title").get_text().strip()
+        return TITLE_SELECTOR.select_one(item).get_text().strip()
 
     def _get_item_price(self, item: Tag, json: dict) -> float:
         return float(
-            item.select_one('.shop-price').get_text().replace('€', '').replace('.', '').replace(',', '.').strip())
+            PRICE_SELECTOR.select_one(item).get_text().replace('€', '').replace('.', '').replace(',', '.').strip())
 
     def _is_item_in_stock(self, item: Tag, bs: BeautifulSoup) -> bool:
-        return item.select_one(".shop-links button") is not None
+        return STOCK_SELECTOR.select_one(item) is not None
 
     def _get_item_url(self, item: Tag, bs: BeautifulSoup) -> str:
-        return self.request_url.join(URL(item.select_one(".shop-details a").attrs["href"])).human_repr()
+        return self.request_url.join(URL(LINK_SELECTOR.select_one(item).attrs["href"])).human_repr()
@@ -1,27 +1,32 @@
-from stockscan.scanner import SearchBasedHttpScanner
+from stockscan.scanner import SearchBasedHttpScanner, class_strainer
 from typing import List
-from urllib.parse import quote
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+import soupsieve
+
+# compiled css selectors
+ITEMS_SELECTOR = soupsieve.compile(".liste-produits .lst_grid > div")
+TITLE_SELECTOR = soupsieve.compile(".nom-produit h2")
+PRICE_SELECTOR = soupsieve.compile(".prix-produit")
 
 
 class CybertekScanner(SearchBasedHttpScanner):
+    target_url_template = "https://www.cybertek.fr/boutique/produit.aspx?q={query}"
+    query_separator = '+'
+    parse_only = class_strainer("liste-produits")
+
     def __init__(self, search_terms: str, **kwargs):
         name = "Cybertek"
         super().__init__(name, search_terms, **kwargs)
 
-    @property
-    def target_url(self) -> str:
-        return f"https://www.cybertek.fr/boutique/produit.aspx?q={quote('+'.join(self._keywords))}"
-
     def _get_all_items_in_page(self, bs: BeautifulSoup) -> List[Tag]:
-        return bs.select(".liste-produits .lst_grid > div")
+        return ITEMS_SELECTOR.select(bs)
 
     def _get_item_title(self, item: Tag, bs: BeautifulSoup) -> str:
-        return item.select_one(".nom-produit h2").get_text().strip()
+        return TITLE_SELECTOR.select_one(item).get_text().strip()
 
     def _get_item_price(self, item: Tag, json: dict) -> float:
-        return float(item.select_one('.prix-produit').get_text().replace('€', '.').strip())
+        return float(PRICE_SELECTOR.select_one(item).get_text().replace('€', '.').strip())
 
     def _is_item_in_stock(self, item: Tag, bs: BeautifulSoup) -> bool:
         return "listing_dispo" in item["class"]
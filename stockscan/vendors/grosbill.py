@@ -1,48 +1,57 @@
 from stockscan.scanner import SearchBasedHttpScanner
 from typing import List
-from urllib.parse import quote
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+import soupsieve
 from yarl import URL
 
+# compiled css selectors
+ITEMS_SELECTOR = soupsieve.compile(".diaporama_mode_display div[id]")
+PRODUCT_SELECTOR = soupsieve.compile(".datasheet_container")
+TITLE_SELECTOR = soupsieve.compile(".product_description h2")
+PRODUCT_TITLE_SELECTOR = soupsieve.compile("h1[itemprop=name]")
+PRICE_SELECTOR = soupsieve.compile(".btn_price_wrapper b")
+PRODUCT_PRICE_SELECTOR = soupsieve.compile("b[itemprop=price]")
+STOCK_SELECTOR = soupsieve.compile(".btn_en_stock_wrapper")
+PRODUCT_STOCK_SELECTOR = soupsieve.compile("link[itemprop=availability]")
+LINK_SELECTOR = soupsieve.compile(".product_description a")
+
 
 class GrosBillScanner(SearchBasedHttpScanner):
+    target_url_template = "https://www.grosbill.com/catv2.cgi?mode=recherche&recherche={query}"
+
     def __init__(self, search_terms: str, **kwargs):
         name = "GrosBill"
         super().__init__(name, search_terms, **kwargs)
 
-    @property
-    def target_url(self) -> str:
-        return f"https://www.grosbill.com/catv2.cgi?mode=recherche&recherche={quote(' '.join(self._keywords))}"
-
     def _get_all_items_in_page(self, bs: BeautifulSoup) -> List[Tag]:
-        return bs.select(".diaporama_mode_display div[id]") or bs.select(".datasheet_container")
+        return ITEMS_SELECTOR.select(bs) or PRODUCT_SELECTOR.select(bs)
 
     def _get_item_title(self, item: Tag, bs: BeautifulSoup) -> Tag:
-        title = item.select_one(".product_description h2") or item.select_one("h1[itemprop=name]")
+        title = TITLE_SELECTOR.select_one(item) or PRODUCT_TITLE_SELECTOR.select_one(item)
         assert title, "Item title not found"
         return title.get_text().strip()
 
     def _get_item_price(self, item: Tag, bs: BeautifulSoup) -> float:
-        price = item.select_one(".btn_price_wrapper b")
+        price = PRICE_SELECTOR.select_one(item)
         if price is not None:
             return float(price.get_text().strip().replace("€", "."))
-        price = item.select_one("b[itemprop=price]")
+        price = PRODUCT_PRICE_SELECTOR.select_one(item)
         if price is not None:
             return float(price.attrs["content"])
         return 0
 
     def _is_item_in_stock(self, item: Tag, bs: BeautifulSoup) -> bool:
-        stock = item.select_one(".btn_en_stock_wrapper")
+        stock = STOCK_SELECTOR.select_one(item)
         if stock is not None:
             return stock.get_text().strip().upper() == "EN STOCK"
-        stock = item.select_one("link[itemprop=availability]")
+        stock = PRODUCT_STOCK_SELECTOR.select_one(item)
         if stock is not None:
             return stock.attrs["href"] == "https://schema.org/InStock"
         return False
 
     def _get_item_url(self, item: Tag, content: BeautifulSoup) -> str:
-        link = item.select_one(".product_description a")
+        link = LINK_SELECTOR.select_one(item)
         if link is not None:
             return self.request_url.join(URL(link.attrs["href"])).human_repr()
         return self.request_url.human_repr()
@@ -1,59 +1,80 @@
-from stockscan.scanner import SearchBasedHttpScanner
-from typing import List
-from urllib.parse import quote
+from stockscan.scanner import SearchBasedHttpScanner, Item, make_soup, json_loads
+from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+import soupsieve
 from yarl import URL
+from aiohttp import ClientSession
 
-import json
 import re
 
+# stock type and price html of each item of a multiple results page, set by its inline scripts
+STOCK_REGEX = re.compile(r"#([\w-]+)\s+\.stock-wrapper.*?stock-([0-9])")
+PRICE_REGEX = re.compile(r"#([\w-]+)\s+\.price-wrapper.*?replaceWith\('<span class=\"prix\">(.*?)</span>'\)")
+
+# compiled css selectors
+ITEMS_SELECTOR = soupsieve.compile(".list li[data-ref]")
+PRODUCT_SELECTOR = soupsieve.compile("div#infosProduit")
+TITLE_SELECTOR = soupsieve.compile(".description h2,#description h1")
+
 
 class HardwareFrScanner(SearchBasedHttpScanner):
+    target_url_template = "https://shop.hardware.fr/search/+ftxt-{query}/"
+    query_separator = '-'
+
     def __init__(self, search_terms: str, **kwargs):
         name = "HardwareFr"
         super().__init__(name, search_terms, **kwargs)
+        # stock types and price html found in the inline scripts of the scanned page
+        self._stock_types: Dict[str, int] = {}
+        self._prices_html: Dict[str, str] = {}
+        # ld+json metadata of a single element page, parsed on first use
+        self._product_metadata: Optional[dict] = None
 
-    @property
-    def target_url(self) -> str:
-        return f"https://shop.hardware.fr/search/+ftxt-{quote('-'.join(self._keywords))}/"
+    async def _scan_response(self, content: BeautifulSoup, session: ClientSession) -> List[Item]:
+        script_data = ''.join(s.string or '' for s in content.find_all("script", attrs={"src": None}))
+        self._stock_types = {}
+        for match in STOCK_REGEX.finditer(script_data):
+            self._stock_types.setdefault(match[1], int(match[2]))
+        self._prices_html = {}
+        for match in PRICE_REGEX.finditer(script_data):
+            self._prices_html.setdefault(match[1], match[2])
+        self._product_metadata = None
+        return await super()._scan_response(content, session)
+
+    def _get_product_metadata(self, bs: BeautifulSoup) -> dict:
+        if self._product_metadata is None:
+            metadata = bs.find("script", attrs={'type': 'application/ld+json'})
+            assert metadata, "Could not find product metadata"
+            metadata_json = json_loads(metadata.string)
+            assert self.is_title_valid(metadata_json["name"]), "Wrong item metadata"
+            self._product_metadata = metadata_json
+        return self._product_metadata
 
     def _get_all_items_in_page(self, bs: BeautifulSoup) -> List[Tag]:
-        return bs.select(".list li[data-ref]") or bs.select("div#infosProduit")
+        return ITEMS_SELECTOR.select(bs) or PRODUCT_SELECTOR.select(bs)
 
     def _get_item_title(self, item: Tag, bs: BeautifulSoup) -> str:
-        title = item.select(".description h2,#description h1")
+        title = TITLE_SELECTOR.select(item)
         assert len(title) == 1, "Item title not found"
         return title[0].get_text()
 
     def _get_item_price(self, item: Tag, bs: BeautifulSoup) -> float:
         item_id = item.attrs["id"]
         if item_id == "infosProduit":  # single element page
-            metadata = bs.find("script", attrs={'type': 'application/ld+json'})
-            assert metadata, "Could not find price"
-            metadata_json = json.loads(metadata.string)
-            assert self.is_title_valid(metadata_json["name"]), "Wrong item metadata"
-            return float(metadata_json["offers"]["price"])
+            return float(self._get_product_metadata(bs)["offers"]["price"])
         else:  # multiple results page
-            script_data = ''.join(s.string for s in bs.find_all("script", attrs={"src": None}))
-            price_html = re.search(
-                "#{id}\s+\.price-wrapper.*?replaceWith\('<span class=\"prix\">(.*?)</span>'\)".format(id=item_id),
-                script_data)[1]
-            return float(BeautifulSoup(price_html, "html.parser").get_text().strip().replace('€', '.'))
+            assert item_id in self._prices_html, "Could not find price"
+            return float(make_soup(self._prices_html[item_id]).get_text().strip().replace('€', '.'))
 
     def _is_item_in_stock(self, item: Tag, bs: BeautifulSoup) -> bool:
         item_id = item.attrs["id"]
         if item_id == "infosProduit":  # single element page
-            metadata = bs.find("script", attrs={'type': 'application/ld+json'})
-            assert metadata, "Could not find stock status"
-            metadata_json = json.loads(metadata.string)
-            assert self.is_title_valid(metadata_json["name"]), "Wrong item metadata"
-            return metadata_json["offers"]["availability"] in [
+            return self._get_product_metadata(bs)["offers"]["availability"] in [
                 'http://schema.org/InStock', 'http://schema.org/OnlineOnly', 'http://schema.org/LimitedAvailability']
         else:  # multiple results page
-            script_data = ''.join(s.string for s in bs.find_all("script", attrs={"src": None}))
-            stock_type = int(re.search("#{id}\s+\.stock-wrapper.*?stock-([0-9])".format(id=item_id), script_data)[1])
-            return stock_type <= 2
+            assert item_id in self._stock_types, "Could not find stock status"
+            return self._stock_types[item_id] <= 2
 
     def _get_item_url(self, item: Tag, content: BeautifulSoup) -> str:
         link = item.findChild("a")
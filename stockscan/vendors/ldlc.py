@@ -1,23 +1,49 @@
-from stockscan.scanner import SearchBasedHttpScanner
-from typing import List, Optional
-from urllib.parse import quote
+from stockscan.scanner import SearchBasedHttpScanner, Item, make_soup
+from typing import List, Optional, Dict
 from bs4 import BeautifulSoup
 from bs4.element import Tag
+import soupsieve
 from yarl import URL
+from aiohttp import ClientSession
 import re
 
+# price html of the items whose price is set by the inline scripts of the page
+PRICE_REGEX = re.compile(r"#([\w-]+)\s+\.price.*?replaceWith\('<div class=\"price\">(.*?)</div>'\)")
+
+# compiled css selectors
+ITEMS_SELECTOR = soupsieve.compile(".listing-product .pdt-item")
+PRODUCT_SELECTOR = soupsieve.compile(".product-bloc")
+PRICE_SELECTOR = soupsieve.compile(".price")
+STOCK_SELECTOR = soupsieve.compile(".stock-web .stock-1,.stock-web .stock-2")
+LINK_SELECTOR = soupsieve.compile(".pdt-desc a")
+
+
 class LDLCScanner(SearchBasedHttpScanner):
+    target_url_template = "https://www.ldlc.com/recherche/{query}/"
+
     def __init__(self, search_terms: str, custom_url: Optional[str] = None, **kwargs):
         name = "LDLC"
         self.custom_url = custom_url
         super().__init__(name, search_terms, **kwargs)
+        if custom_url:
+            self._target_url = custom_url
+        # price html found in the inline scripts of the scanned page, parsed on first use
+        self._prices_html: Optional[Dict[str, str]] = None
+
+    async def _scan_response(self, content: BeautifulSoup, session: ClientSession) -> List[Item]:
+        self._prices_html = None
+        return await super()._scan_response(content, session)
 
-    @property
-    def target_url(self) -> str:
-        return self.custom_url or f"https://www.ldlc.com/recherche/{quote(' '.join(self._keywords))}/"
+    def _get_prices_html(self, bs: BeautifulSoup) -> Dict[str, str]:
+        if self._prices_html is None:
+            script_data = ''.join(s.string or '' for s in bs.find_all("script", attrs={"src": None}))
+            self._prices_html = {}
+            for match in PRICE_REGEX.finditer(script_data):
+                self._prices_html.setdefault(match[1], match[2])
+        return self._prices_html
 
     def _get_all_items_in_page(self, bs: BeautifulSoup) -> List[Tag]:
-        return bs.select(".listing-product .pdt-item") or bs.select(".product-bloc")
+        return ITEMS_SELECTOR.select(bs) or PRODUCT_SELECTOR.select(bs)
 
     def _get_item_title(self, item: Tag, bs: BeautifulSoup) -> Tag:
         title = item.find(class_="title-3") or item.find(class_="title-1")
@@ -25,24 +51,21 @@ class LDLCScanner(SearchBasedHttpScanner):
         return title.get_text()
 
     def _get_item_price(self, item: Tag, bs: BeautifulSoup) -> float:
-        price = item.select_one(".price").get_text().strip()
+        price = PRICE_SELECTOR.select_one(item).get_text().strip()
         if price:
             return float(price.replace('€', '.').replace('\xa0', ''))
         else:
-            script_data = ''.join(s.string for s in bs.find_all("script", attrs={"src": None}))
-            match = re.search(
-                "#{id}\s+\.price.*?replaceWith\('<div class=\"price\">(.*?)</div>'\)".format(id=item.attrs["id"]),
-                script_data)
-            if match:
-                price = BeautifulSoup(match[1], "html.parser").get_text().strip()
+            price_html = self._get_prices_html(bs).get(item.attrs["id"])
+            if price_html is not None:
+                price = make_soup(price_html).get_text().strip()
                 return float(price.replace('€', '.').replace('\xa0', ''))
         assert False, "could not parse price"
 
     def _is_item_in_stock(self, item: Tag, bs: BeautifulSoup) -> bool:
-        return len(item.select(".stock-web .stock-1,.stock-web .stock-2")) > 0
+        return len(STOCK_SELECTOR.select(item)) > 0
 
     def _get_item_url(self, item: Tag, content: BeautifulSoup) -> str:
-        link = item.select_one(".pdt-desc a")
+        link = LINK_SELECTOR.select_one(item)
         if link is not None:
             return self.request_url.join(URL(link.attrs["href"])).human_repr()
         return self.request_url.human_repr()
@@ -1,44 +1,61 @@
-from stockscan.scanner import SearchBasedHttpScanner, Item
+from stockscan.scanner import SearchBasedHttpScanner, Item, make_soup, json_loads
 from typing import List
 from bs4 import BeautifulSoup
 from bs4.element import Tag
-from urllib.parse import quote
-from aiohttp import ClientTimeout
+import soupsieve
+from aiohttp import ClientTimeout, ClientSession
 from yarl import URL
 
-import aiohttp
 import re
 import json
 
+STOCK_REGEX = re.compile(r"o-availability__value--stock_([0-9])")
+
+# compiled css selectors
+ITEMS_SELECTOR = soupsieve.compile("ul.c-products-list li.c-products-list__item")
+PRODUCT_SELECTOR = soupsieve.compile("#tpl__product-page")
+TITLE_SELECTOR = soupsieve.compile(".c-products-list__item .c-product__title, .c-product__header h1")
+LINK_SELECTOR = soupsieve.compile(".c-products-list__item .c-product__link")
+OFFER_ID_SELECTOR = soupsieve.compile("[data-offer-id]")
+
 
 class MaterielNetScanner(SearchBasedHttpScanner):
+    target_url_template = "https://www.materiel.net/recherche/{query}/"
+
+    # stock is fetched by a separate request, the search page being unchanged does not mean stock is
+    reuse_unmodified = False
+
     def __init__(self, search_terms: str, **kwargs):
         name = "MaterielNet"
         super().__init__(name, search_terms, **kwargs)
 
-    @property
-    def target_url(self) -> str:
-        return f"https://www.materiel.net/recherche/{quote(' '.join(self._keywords))}/"
-
     def _get_all_items_in_page(self, bs: BeautifulSoup) -> List[Tag]:
-        return bs.select("ul.c-products-list li.c-products-list__item") or bs.select("#tpl__product-page")
+        return ITEMS_SELECTOR.select(bs) or PRODUCT_SELECTOR.select(bs)
 
     def _get_item_title(self, item: Tag, bs: BeautifulSoup) -> str:
-        title = item.select(".c-products-list__item .c-product__title, .c-product__header h1")
+        title = TITLE_SELECTOR.select(item)
         assert len(title) == 1, "Multiple item title found or no title found"
         return title[0].get_text()
 
     def _get_item_url(self, item: Tag, content: BeautifulSoup) -> str:
-        link = item.select_one(".c-products-list__item .c-product__link")
+        link = LINK_SELECTOR.select_one(item)
         if link is not None:
             return self.request_url.join(URL(link.attrs["href"])).human_repr()
         return self.request_url.human_repr()
 
-    async def _scan_response(self, content: BeautifulSoup) -> List[Item]:
+    async def _scan_response(self, content: BeautifulSoup, session: ClientSession) -> List[Item]:
         def get_entry_id(item: Tag):
-            return item.select_one("[data-offer-id]").attrs["data-offer-id"]
+            return OFFER_ID_SELECTOR.select_one(item).attrs["data-offer-id"]
+
+        # only query stock and prices of wanted items
+        entries = {}
+        for entry in self._get_all_items_in_page(content):
+            title = self._get_item_title(entry, content)
+            if self.filter_title(title):
+                entries[get_entry_id(entry)] = (entry, title)
+        if not entries:
+            return []
 
-        entries = {get_entry_id(entry): entry for entry in self._get_all_items_in_page(content)}
         query_offers = [{"offerId": entry_id, "marketplace": False} for entry_id in entries.keys()]
         stock_query_payload = {
             "json": json.dumps({
@@ -51,24 +68,23 @@ class MaterielNetScanner(SearchBasedHttpScanner):
         headers = dict(self.request_headers)
         headers.update({'x-requested-with': 'XMLHttpRequest'})
         stock_query_url = "https://www.materiel.net/product-listing/stock-price/"
-        async with aiohttp.ClientSession(headers=headers,
-                                         raise_for_status=True,
-                                         timeout=ClientTimeout(total=self.time_out)) as session:
-            async with session.post(stock_query_url, data=stock_query_payload) as resp:
-                content_json = await resp.json()
-                item_stocks = content_json["stock"]
-                item_prices = content_json["price"]
+        async with session.post(stock_query_url, data=stock_query_payload, headers=headers,
+                                raise_for_status=True,
+                                timeout=ClientTimeout(total=self.time_out)) as resp:
+            content_json = await resp.json(loads=json_loads)
+            item_stocks = content_json["stock"]
+            item_prices = content_json["price"]
 
         def get_price(item: str) -> float:
-            return float(BeautifulSoup(item, "html.parser").get_text().strip().replace('€', '.').replace('\xa0', ''))
+            return float(make_soup(item).get_text().strip().replace('€', '.').replace('\xa0', ''))
 
         def is_in_stock(item: str) -> bool:
-            match = re.search(r"o-availability__value--stock_([0-9])", item)
+            match = STOCK_REGEX.search(item)
             assert match, "Failed to match string looking for stock"
             return int(match[1]) <= 2
 
-        return [item for item in (Item(title=self._get_item_title(entry, content),
-                                       price=get_price(item_prices[entry_id]),
-                                       in_stock=is_in_stock(item_stocks[entry_id]),
-                                       url=self._get_item_url(entry, content))
-                                  for entry_id, entry in entries.items()) if self.filter_item(item)]
+        return [Item(title=title,
+                     price=get_price(item_prices[entry_id]),
+                     in_stock=is_in_stock(item_stocks[entry_id]),
+                     url=self._get_item_url(entry, content))
+                for entry_id, (entry, title) in entries.items()]
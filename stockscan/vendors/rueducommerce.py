@@ -1,19 +1,19 @@
 from stockscan.scanner import SearchBasedHttpScanner
 from typing import List
-from urllib.parse import quote
 from yarl import URL
 
 
 class RueDuCommerceScanner(SearchBasedHttpScanner):
+    target_url_template = "https://www.rueducommerce.fr/listingDyn?" \
+                          "boutique_id=18&langue_id=1&recherche={query}&gammesId=25476&from=0"
+    user_url_template = "https://www.rueducommerce.fr/r/{query}.html"
+    query_separator = '-'
+    json_only = True
+
     def __init__(self, search_terms: str, **kwargs):
         name = "RueDuCommerce"
         super().__init__(name, search_terms, **kwargs)
 
-    @property
-    def target_url(self) -> str:
-        return "https://www.rueducommerce.fr/listingDyn?" \
-               f"boutique_id=18&langue_id=1&recherche={quote('-'.join(self._keywords))}&gammesId=25476&from=0"
-
     def _get_all_items_in_page(self, json: dict) -> List[dict]:
         return json["produits"]
 
@@ -29,7 +29,3 @@ class RueDuCommerceScanner(SearchBasedHttpScanner):
 
     def _get_item_url(self, item: dict, content: dict) -> str:
         return self.request_url.join(URL(item["lien"])).human_repr()
-
-    @property
-    def user_url(self) -> str:
-        return f"https://www.rueducommerce.fr/r/{quote('-'.join(self._keywords))}.html"
@@ -0,0 +1,70 @@
+import asyncio
+import unittest
+
+from yarl import URL
+
+from stockscan.vendors.alternate import AlternateFRScanner
+
+LISTING = b"""<html><body><div class="listing">
+<a class="productBox" href="https://www.alternate.fr/p/1">
+<div class="product-name">RTX 3080 Foo</div><span class="price">799,95 \xe2\x82\xac</span>
+<span class="delivery-info">En stock</span></a>
+<a class="productBox" href="https://www.alternate.fr/p/2">
+<div class="product-name">RTX 3070 Bar</div><span class="price">599,00 \xe2\x82\xac</span>
+<span class="delivery-info">Indisponible</span></a>
+</div></body></html>"""
+
+
+class StubResponse:
+    def __init__(self, url: str, body: bytes = b""):
+        self.url = URL(url)
+        self.charset = "utf-8"
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class StubSession:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, **kwargs):
+        self.requests.append(("GET", url, kwargs))
+        return StubResponse(url)
+
+    def post(self, url, **kwargs):
+        self.requests.append(("POST", url, kwargs))
+        return StubResponse(url, LISTING)
+
+
+class AlternateScanTest(unittest.TestCase):
+    def test_scan(self):
+        scanner = AlternateFRScanner("rtx 3080")
+        session = StubSession()
+        result = asyncio.run(scanner.scan(session))
+
+        self.assertIsNone(result.error)
+        self.assertEqual(len(result.items), 1)
+        item = result.items[0]
+        self.assertEqual(item.title, "RTX 3080 Foo")
+        self.assertEqual(item.price, 799.95)
+        self.assertTrue(item.in_stock)
+        self.assertEqual(item.url, "https://www.alternate.fr/p/1")
+
+        # cookies are fetched from the search page, which is then the referer of the listing request
+        (get_method, get_url, _), (post_method, post_url, post_kwargs) = session.requests
+        self.assertEqual((get_method, get_url), ("GET", scanner.user_url))
+        self.assertEqual((post_method, post_url), ("POST", scanner.target_url))
+        self.assertEqual(post_kwargs["headers"]["Referer"], scanner.user_url)
+        self.assertEqual(post_kwargs["data"]["q"], "rtx 3080")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import asyncio
+import unittest
+
+from yarl import URL
+
+from stockscan.vendors.amd import AMDScanner
+from stockscan.vendors.caseking import CaseKingScanner
+from stockscan.vendors.cybertek import CybertekScanner
+
+# the strained wrappers carry more classes than the one the scanners look for
+AMD_PAGE = b"""<html><body><div class="view view-shop-product-search view-id-shop_product_search">
+<div class="shop-content"><div class="shop-title">AMD Radeon RX 6800 XT</div>
+<div class="shop-price">649,00 \xe2\x82\xac</div><div class="shop-links"><button>Ajouter au panier</button></div>
+<div class="shop-details"><a href="/fr/direct-buy/5458372200/fr">details</a></div></div>
+</div></body></html>"""
+
+CASEKING_PAGE = b"""<html><body><div class="artbox grid_item">
+<a class="producttitles" data-description="Radeon RX 6800 XT" href="https://www.caseking.de/en/rx-6800-xt"></a>
+<span class="price">1,049.90 \xe2\x82\xac*</span><span class="deliverable1">In stock</span>
+</div></body></html>"""
+
+CYBERTEK_PAGE = b"""<html><body><div class="liste-produits clearfix"><div class="lst_grid">
+<div class="listing_dispo"><a href="https://www.cybertek.fr/rx-6800-xt.aspx"></a>
+<div class="nom-produit"><h2>Radeon RX 6800 XT</h2></div><div class="prix-produit">999\xe2\x82\xac95</div></div>
+</div></div></body></html>"""
+
+
+class StubResponse:
+    status = 200
+    charset = "utf-8"
+    content_type = "text/html"
+    headers = {}
+
+    def __init__(self, url: str, body: bytes):
+        self.url = URL(url)
+        self._body = body
+
+    async def read(self) -> bytes:
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class StubSession:
+    def __init__(self, body: bytes):
+        self._body = body
+
+    def request(self, method, url, **kwargs):
+        return StubResponse(url, self._body)
+
+
+class ParseOnlyTest(unittest.TestCase):
+    def scan(self, scanner, body):
+        result = asyncio.run(scanner.scan(StubSession(body)))
+        self.assertIsNone(result.error)
+        self.assertEqual(len(result.items), 1)
+        return result.items[0]
+
+    def test_amd(self):
+        item = self.scan(AMDScanner("rx 6800"), AMD_PAGE)
+        self.assertEqual(item.title, "AMD Radeon RX 6800 XT")
+        self.assertEqual(item.price, 649.0)
+        self.assertTrue(item.in_stock)
+        self.assertEqual(item.url, "https://www.amd.com/fr/direct-buy/5458372200/fr")
+
+    def test_caseking(self):
+        item = self.scan(CaseKingScanner("rx 6800"), CASEKING_PAGE)
+        self.assertEqual(item.title, "Radeon RX 6800 XT")
+        self.assertEqual(item.price, 1049.9)
+        self.assertTrue(item.in_stock)
+        self.assertEqual(item.url, "https://www.caseking.de/en/rx-6800-xt")
+
+    def test_cybertek(self):
+        item = self.scan(CybertekScanner("rx 6800"), CYBERTEK_PAGE)
+        self.assertEqual(item.title, "Radeon RX 6800 XT")
+        self.assertEqual(item.price, 999.95)
+        self.assertTrue(item.in_stock)
+        self.assertEqual(item.url, "https://www.cybertek.fr/rx-6800-xt.aspx")
+
+
+if __name__ == '__main__':
+    unittest.main()